@@ -3,7 +3,10 @@ API v1 Router
 Aggregates all API endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+
+from app.core.config import settings
+from app.services.similarity import get_similarity_index
 
 router = APIRouter()
 
@@ -29,6 +32,32 @@ async def search_models(
         "message": "Database not initialized yet. Run init_db.py script first."
     }
 
+@router.get("/models/{model_id:path}/similar", tags=["Models"])
+async def get_similar_models(
+    model_id: str,
+    limit: int = Query(default=settings.SIMILARITY_TOP_K, ge=1, le=settings.MAX_PAGE_SIZE)
+):
+    """
+    Get models with the most similar tags, task and datasets
+
+    Scores are Jaccard estimates from the MinHash/LSH index built by init_db.py
+    """
+    index = get_similarity_index()
+    if index is None:
+        return {
+            "model_id": model_id,
+            "results": [],
+            "message": "Similarity index not built yet. Run init_db.py script first."
+        }
+
+    return {
+        "model_id": model_id,
+        "results": [
+            {"id": similar_id, "score": round(score, 4)}
+            for similar_id, score in index.query(model_id, limit, settings.SIMILARITY_MAX_BUCKET)
+        ]
+    }
+
 @router.get("/models/{model_id:path}", tags=["Models"])
 async def get_model(model_id: str):
     """
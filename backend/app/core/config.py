@@ -40,6 +40,21 @@ class Settings(BaseSettings):
 
     # Data
     DATA_FILE_PATH: str = Field(default="/app/data/hf_models.jsonl", description="Path to JSONL data file")
+    CATALOG_GENERATION_PATH: str = Field(default="/app/data/catalog_generation.json", description="Marker file naming the catalog generation being served")
+
+    # Catalog reload (init_db.py --reload)
+    SHADOW_SCHEMA: str = Field(default="catalog_shadow", description="Schema the next catalog is loaded into")
+    RETIRED_SCHEMA: str = Field(default="catalog_retired", description="Schema the previous catalog is moved to during a swap")
+    SWAP_LOCK_TIMEOUT: str = Field(default="300ms", description="Max wait for table locks per swap attempt; readers queue behind the swap for at most this long")
+    SWAP_ATTEMPTS: int = Field(default=10, description="Swap attempts before giving up and keeping the shadow catalog")
+    SWAP_RETRY_DELAY: float = Field(default=1.0, description="Seconds before the first swap retry; doubles on each retry")
+
+    # Similarity (MinHash/LSH)
+    SIMILARITY_INDEX_PATH: str = Field(default="/app/data/similarity_index.npz", description="Path to the similarity index file")
+    SIMILARITY_NUM_PERM: int = Field(default=64, description="MinHash signature size")
+    SIMILARITY_BANDS: int = Field(default=16, description="LSH bands; must evenly divide SIMILARITY_NUM_PERM")
+    SIMILARITY_TOP_K: int = Field(default=10, description="Default number of similar models returned")
+    SIMILARITY_MAX_BUCKET: int = Field(default=1000, description="Max models taken from a single LSH bucket per lookup")
 
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
@@ -1,4 +1,4 @@
 """Database package"""
-from app.db.models import Base, Model, ModelTag, BaseModelRelation, DatasetRelation, ModelSibling
+from app.db.models import Base, Model, ModelTag, BaseModelRelation, DatasetRelation, ModelSibling, CatalogGeneration
 
-__all__ = ["Base", "Model", "ModelTag", "BaseModelRelation", "DatasetRelation", "ModelSibling"]
+__all__ = ["Base", "Model", "ModelTag", "BaseModelRelation", "DatasetRelation", "ModelSibling", "CatalogGeneration"]
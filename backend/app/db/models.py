@@ -88,3 +88,16 @@ class ModelSibling(Base):
     lfs = Column(Boolean)
 
     model = relationship("Model", back_populates="siblings")
+
+
+class CatalogGeneration(Base):
+    """One row per catalog load; the highest id is the generation being served"""
+    __tablename__ = "catalog_generations"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    loaded_at = Column(TIMESTAMP, default=datetime.utcnow)
+    total_models = Column(BigInteger, default=0)
+    total_tags = Column(BigInteger, default=0)
+    total_base_model_relations = Column(BigInteger, default=0)
+    total_dataset_relations = Column(BigInteger, default=0)
+    stats = Column(JSON)
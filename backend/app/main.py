@@ -6,10 +6,13 @@ Main application entry point
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 import logging
 
 from app.core.config import settings
 from app.api.v1 import router as api_router
+from app.services.catalog import current_generation
+from app.services.similarity import load_similarity_index
 
 # Configure logging
 logging.basicConfig(
@@ -59,7 +62,8 @@ async def health_check():
         return {
             "status": "healthy",
             "version": "1.0.0",
-            "database": "not_checked"  # Will implement after DB setup
+            "database": "not_checked",  # Will implement after DB setup
+            "catalog_generation": current_generation()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -77,6 +81,8 @@ async def startup_event():
     logger.info("Starting AI Model Catalog API...")
     logger.info(f"Debug mode: {settings.DEBUG}")
     logger.info(f"CORS origins: {settings.BACKEND_CORS_ORIGINS}")
+    if await run_in_threadpool(load_similarity_index) is None:
+        logger.warning(f"Similarity index not found at {settings.SIMILARITY_INDEX_PATH}")
     # TODO: Initialize database connection pool
 
 @app.on_event("shutdown")
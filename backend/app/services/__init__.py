@@ -0,0 +1,5 @@
+"""Business logic services"""
+from app.services.catalog import current_generation, write_generation_marker
+from app.services.similarity import MinHashLSHIndex, model_features, get_similarity_index, load_similarity_index
+
+__all__ = ["current_generation", "write_generation_marker", "MinHashLSHIndex", "model_features", "get_similarity_index", "load_similarity_index"]
@@ -0,0 +1,53 @@
+"""
+Catalog generation tracking
+init_db.py writes a marker file after each successful load; in-process caches
+key on the generation it names so they refresh when a new catalog is swapped in
+"""
+
+import json
+import logging
+import os
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_generation = None
+_marker_mtime = None
+
+
+def write_generation_marker(generation, **info):
+    """Publish a new catalog generation to running API processes"""
+    path = settings.CATALOG_GENERATION_PATH
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"generation": generation, **info}, f, default=str)
+    os.replace(tmp_path, path)
+
+
+def current_generation():
+    """
+    Return the catalog generation currently being served (None before the first load)
+
+    Only a stat() per call; the marker is re-read when its mtime changes.
+    """
+    global _generation, _marker_mtime
+    try:
+        mtime = os.stat(settings.CATALOG_GENERATION_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return _generation
+
+    if mtime != _marker_mtime:
+        try:
+            with open(settings.CATALOG_GENERATION_PATH, "r", encoding="utf-8") as f:
+                generation = json.load(f)["generation"]
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Could not read catalog generation marker: {e}")
+            return _generation
+
+        _marker_mtime = mtime
+        if generation != _generation:
+            logger.info(f"Catalog generation is now {generation}")
+            _generation = generation
+
+    return _generation
@@ -0,0 +1,308 @@
+"""
+Model similarity index
+MinHash signatures over each model's tag/dataset set, bucketed with LSH
+so "similar models" lookups never need pairwise Jaccard across the catalog
+"""
+
+import logging
+import os
+import threading
+import time
+import zlib
+from array import array
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.catalog import current_generation
+from app.services.tags import categorize_tag
+
+logger = logging.getLogger(__name__)
+
+# Universal hashing (a * x + b) mod p, truncated to 32 bits
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# FNV-1a constants used to fold a band of signature rows into one bucket key
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+# Models hashed per vectorized step while building (bounds peak memory)
+BUILD_CHUNK_SIZE = 5000
+
+# Tag types that say what a model is for; near-universal tags such as
+# region:us or endpoints_compatible would swamp Jaccard on short tag sets
+SIMILARITY_TAG_TYPES = {'license', 'dataset', 'language'}
+
+
+def model_features(tags, pipeline_tag=None):
+    """Build the feature set compared for similarity: task, datasets, languages and licenses"""
+    features = {tag for tag in tags or [] if categorize_tag(tag) in SIMILARITY_TAG_TYPES}
+    if pipeline_tag:
+        features.add(f"pipeline_tag:{pipeline_tag}")
+    return features
+
+
+def jaccard(a, b):
+    """Exact Jaccard similarity of two sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class MinHashLSHIndex:
+    """
+    MinHash signatures plus LSH band buckets for a set of models
+
+    Signatures are ``num_perm`` 32-bit minima per model. They are split into
+    ``num_bands`` bands; models sharing any band key become candidates, and
+    candidates are ranked by the fraction of equal signature slots, which
+    estimates their Jaccard similarity. More bands raise recall at the cost of
+    larger candidate sets per query.
+    """
+
+    def __init__(self, ids, signatures, num_bands, seed=1, band_index=None):
+        num_perm = signatures.shape[1]
+        if num_bands < 1 or num_perm % num_bands:
+            raise ValueError(f"num_bands ({num_bands}) must evenly divide num_perm ({num_perm})")
+
+        self.ids = list(ids)
+        self.signatures = signatures
+        self.num_perm = num_perm
+        self.num_bands = num_bands
+        self.rows_per_band = num_perm // num_bands
+        self.seed = seed
+        self._positions = {model_id: pos for pos, model_id in enumerate(self.ids)}
+
+        if band_index is None:
+            keys = self._band_keys(signatures)
+            order = np.argsort(keys, axis=1, kind="stable")
+            band_index = (np.take_along_axis(keys, order, axis=1), order.astype(np.int32))
+        self._sorted_keys, self._band_order = band_index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, model_id):
+        return model_id in self._positions
+
+    @staticmethod
+    def _permutations(num_perm, seed):
+        """Draw the (a, b) coefficients of the hash permutations"""
+        rng = np.random.default_rng(seed)
+        a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        return a, b
+
+    @staticmethod
+    def _signatures(hashes, lengths, a, b):
+        """Compute MinHash signatures for consecutive, non-empty feature sets"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        offsets = np.zeros(len(lengths), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=offsets[1:])
+
+        # (total_features, num_perm); a and x are both < 2**32 so a * x fits in uint64
+        permuted = (np.outer(hashes, a) % MERSENNE_PRIME + b) % MERSENNE_PRIME & MAX_HASH
+        return np.minimum.reduceat(permuted, offsets, axis=0).astype(np.uint32)
+
+    def _band_keys(self, signatures):
+        """Fold each band of signature rows into a single uint64 bucket key"""
+        bands = signatures.reshape(len(signatures), self.num_bands, self.rows_per_band).astype(np.uint64)
+        keys = np.full(bands.shape[:2], FNV_OFFSET, dtype=np.uint64)
+        for row in range(self.rows_per_band):
+            keys = (keys ^ bands[:, :, row]) * FNV_PRIME
+        return np.ascontiguousarray(keys.T)  # (num_bands, num_models)
+
+    @classmethod
+    def build(cls, items, num_perm=64, num_bands=16, seed=1):
+        """
+        Build an index from an iterable of (model_id, feature_set) pairs
+
+        Models with an empty feature set are skipped, since they would all
+        collide into the same buckets without being meaningfully similar.
+        """
+        a, b = cls._permutations(num_perm, seed)
+        ids = []
+        signatures = []
+        hashes = array("I")
+        lengths = []
+
+        def flush():
+            signatures.append(cls._signatures(hashes, np.asarray(lengths, dtype=np.int64), a, b))
+            del hashes[:]
+            lengths.clear()
+
+        for model_id, features in items:
+            if not features:
+                continue
+            ids.append(model_id)
+            hashes.extend(zlib.crc32(feature.encode("utf-8")) for feature in features)
+            lengths.append(len(features))
+            if len(lengths) >= BUILD_CHUNK_SIZE:
+                flush()
+
+        if lengths:
+            flush()
+
+        if signatures:
+            signatures = np.concatenate(signatures)
+        else:
+            signatures = np.empty((0, num_perm), dtype=np.uint32)
+        return cls(ids, signatures, num_bands, seed=seed)
+
+    def candidates(self, model_id, max_bucket=None):
+        """
+        Positions of models sharing at least one LSH bucket with model_id
+
+        max_bucket caps how many members are taken from any one bucket, so a
+        very common feature combination cannot turn a lookup into a scan.
+        """
+        pos = self._positions.get(model_id)
+        if pos is None:
+            return np.empty(0, dtype=np.int32)
+
+        keys = self._band_keys(self.signatures[pos:pos + 1])[:, 0]
+        found = []
+        for band, key in enumerate(keys):
+            lo = np.searchsorted(self._sorted_keys[band], key, side="left")
+            hi = np.searchsorted(self._sorted_keys[band], key, side="right")
+            if max_bucket is not None:
+                hi = min(hi, lo + max_bucket)
+            found.append(self._band_order[band, lo:hi])
+
+        found = np.unique(np.concatenate(found))
+        return found[found != pos]
+
+    def query(self, model_id, k=10, max_bucket=None):
+        """Return up to k (model_id, estimated_jaccard) pairs, most similar first"""
+        found = self.candidates(model_id, max_bucket)
+        if not len(found):
+            return []
+
+        signature = self.signatures[self._positions[model_id]]
+        scores = (self.signatures[found] == signature).mean(axis=1)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self.ids[found[i]], float(scores[i])) for i in top]
+
+    def save(self, path):
+        """Write the index to an .npz file, replacing any previous file atomically"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                ids=np.frombuffer("\n".join(self.ids).encode("utf-8"), dtype=np.uint8),
+                signatures=self.signatures,
+                sorted_keys=self._sorted_keys,
+                band_order=self._band_order,
+                num_bands=self.num_bands,
+                seed=self.seed,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index previously written with save()"""
+        with np.load(path) as data:
+            raw_ids = data["ids"].tobytes().decode("utf-8")
+            return cls(
+                raw_ids.split("\n") if raw_ids else [],
+                data["signatures"],
+                int(data["num_bands"]),
+                seed=int(data["seed"]),
+                band_index=(data["sorted_keys"], data["band_order"]),
+            )
+
+
+def measure_recall(index, feature_sets, query_ids, k=10):
+    """
+    Measure LSH top-k recall and latency against exact Jaccard
+
+    A hit is any LSH result whose exact Jaccard is at least the k-th best
+    exact score, so ties at the cutoff don't count against the index.
+    Returns mean recall and mean per-query latency in milliseconds.
+    """
+    recalls = []
+    lsh_ms = []
+    exact_ms = []
+
+    for query_id in query_ids:
+        query = feature_sets[query_id]
+
+        start = time.perf_counter()
+        approx = index.query(query_id, k)
+        lsh_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        exact = sorted(
+            (jaccard(query, features) for other_id, features in feature_sets.items() if other_id != query_id),
+            reverse=True,
+        )[:k]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        exact = [score for score in exact if score > 0]
+        if not exact:
+            continue
+        hits = sum(1 for other_id, _ in approx if jaccard(query, feature_sets[other_id]) >= exact[-1])
+        recalls.append(min(hits, len(exact)) / len(exact))
+
+    return {
+        "queries": len(recalls),
+        "recall": float(np.mean(recalls)) if recalls else 0.0,
+        "lsh_ms": float(np.mean(lsh_ms)) if lsh_ms else 0.0,
+        "exact_ms": float(np.mean(exact_ms)) if exact_ms else 0.0,
+    }
+
+
+_index = None
+_requested_generation = object()  # generation whose index was last asked for; nothing yet
+_loader = None
+_lock = threading.Lock()
+
+
+def _load_index(path, generation):
+    """Load the index for a generation and swap it in, unless a newer one was requested meanwhile"""
+    global _index
+    logger.info(f"Loading similarity index from {path} (generation {generation})...")
+    try:
+        index = MinHashLSHIndex.load(path)
+    except Exception as e:
+        logger.error(f"Could not load similarity index for generation {generation}: {e}")
+        return
+
+    with _lock:
+        if generation != _requested_generation:
+            return
+        _index = index
+    logger.info(f"Similarity index loaded ({len(index)} models)")
+
+
+def load_similarity_index():
+    """Load the index for the current generation in the calling thread (used at startup)"""
+    global _requested_generation
+    path = settings.SIMILARITY_INDEX_PATH
+    if os.path.exists(path):
+        generation = current_generation()
+        with _lock:
+            _requested_generation = generation
+        _load_index(path, generation)
+    return _index
+
+
+def get_similarity_index():
+    """
+    Return the similarity index being served (None until one is built)
+
+    When the catalog generation changes the new index is loaded in a background
+    thread; the previous index keeps serving until it is ready.
+    """
+    global _requested_generation, _loader
+    generation = current_generation()
+    path = settings.SIMILARITY_INDEX_PATH
+    with _lock:
+        if generation != _requested_generation and os.path.exists(path):
+            _requested_generation = generation
+            _loader = threading.Thread(
+                target=_load_index, args=(path, generation), name="similarity-index-loader", daemon=True
+            )
+            _loader.start()
+        return _index
@@ -0,0 +1,17 @@
+"""
+Tag categorization shared by ingestion and similarity
+"""
+
+
+def categorize_tag(tag):
+    """Categorize a tag by type"""
+    if tag.startswith('license:'):
+        return 'license'
+    elif tag.startswith('dataset:'):
+        return 'dataset'
+    elif len(tag) == 2 and tag.isalpha():
+        return 'language'
+    elif tag in ['transformers', 'diffusers', 'peft', 'pytorch', 'tensorflow', 'jax']:
+        return 'framework'
+    else:
+        return 'general'
@@ -1,22 +1,35 @@
 """
 Database initialization script
 Parses JSONL file and populates PostgreSQL database
+
+With --reload the catalog is loaded into a shadow schema and swapped in
+atomically, so the live tables stay complete and readable throughout
 """
 
+import argparse
 import json
 import sys
 import os
 from datetime import datetime
 import logging
 import re
+import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func, inspect, select, text, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker
-from app.db.models import Base, Model, ModelTag, BaseModelRelation, DatasetRelation, ModelSibling
+from sqlalchemy.schema import CreateIndex, CreateTable
+from app.db.models import Base, Model, ModelTag, BaseModelRelation, DatasetRelation, ModelSibling, CatalogGeneration
 from app.core.config import settings
+from app.services.catalog import write_generation_marker
+from app.services.similarity import MinHashLSHIndex, model_features
+from app.services.tags import categorize_tag
+
+# Schema comment marking a shadow catalog that passed validation and may be swapped in
+VALIDATED_COMMENT = "validated"
 
 # Configure logging
 logging.basicConfig(
@@ -60,29 +73,19 @@ def parse_siblings(siblings_data):
         return []
 
 
-def categorize_tag(tag):
-    """Categorize a tag by type"""
-    if tag.startswith('license:'):
-        return 'license'
-    elif tag.startswith('dataset:'):
-        return 'dataset'
-    elif len(tag) == 2 and tag.isalpha():
-        return 'language'
-    elif tag in ['transformers', 'diffusers', 'peft', 'pytorch', 'tensorflow', 'jax']:
-        return 'framework'
-    else:
-        return 'general'
+def create_db_engine():
+    """Create an engine with the synchronous driver"""
+    db_url = settings.database_url_computed.replace('asyncpg', 'psycopg2')
+    logger.info(f"Connecting to database: {db_url.split('@')[1]}")  # Hide credentials
+
+    return create_engine(db_url, echo=False)
 
 
 def init_database():
     """Initialize database and create tables"""
     logger.info("Initializing database...")
 
-    # Create engine with synchronous driver for setup
-    db_url = settings.database_url_computed.replace('asyncpg', 'psycopg2')
-    logger.info(f"Connecting to database: {db_url.split('@')[1]}")  # Hide credentials
-
-    engine = create_engine(db_url, echo=False)
+    engine = create_db_engine()
 
     # Create tables
     logger.info("Creating tables...")
@@ -92,8 +95,13 @@ def init_database():
     return engine
 
 
-def load_data(engine, data_file):
-    """Load data from JSONL file into database"""
+def load_data(engine, data_file, strict=False):
+    """
+    Load data from JSONL file into database
+
+    Returns the row counts parsed from the file, for validation. With strict,
+    any insert error aborts the load instead of being logged and skipped.
+    """
     logger.info(f"Loading data from {data_file}...")
 
     Session = sessionmaker(bind=engine)
@@ -105,6 +113,12 @@ def load_data(engine, data_file):
         errors = 0
         batch_size = 1000
         models_batch = []
+        parsed = {
+            "total_models": 0,
+            "total_tags": 0,
+            "total_base_model_relations": 0,
+            "total_dataset_relations": 0,
+        }
 
         with open(data_file, 'r', encoding='utf-8') as f:
             for line_num, line in enumerate(f, 1):
@@ -141,25 +155,32 @@ def load_data(engine, data_file):
                     models_batch.append((model, data))
                     processed += 1
 
-                    # Batch insert
-                    if len(models_batch) >= batch_size:
-                        insert_batch(session, models_batch)
-                        models_batch = []
+                    tags = data.get('tags') or []
+                    parsed["total_tags"] += len(tags)
+                    parsed["total_base_model_relations"] += sum(1 for tag in tags if tag.startswith('base_model:'))
+                    parsed["total_dataset_relations"] += sum(1 for tag in tags if tag.startswith('dataset:'))
 
                 except Exception as e:
                     errors += 1
                     if errors <= 10:  # Log first 10 errors
                         logger.error(f"Error on line {line_num}: {e}")
 
+                # Batch insert
+                if len(models_batch) >= batch_size:
+                    insert_batch(session, models_batch, strict)
+                    models_batch = []
+
         # Insert remaining models
         if models_batch:
-            insert_batch(session, models_batch)
+            insert_batch(session, models_batch, strict)
 
         session.commit()
         logger.info(f"Data loading complete!")
         logger.info(f"Total lines: {total_lines}")
         logger.info(f"Successfully processed: {processed}")
         logger.info(f"Errors: {errors}")
+        parsed["total_models"] = processed
+        return parsed
 
     except Exception as e:
         logger.error(f"Fatal error during data loading: {e}")
@@ -169,7 +190,7 @@ def load_data(engine, data_file):
         session.close()
 
 
-def insert_batch(session, models_batch):
+def insert_batch(session, models_batch, strict=False):
     """Insert a batch of models with related data"""
     for model, data in models_batch:
         try:
@@ -242,9 +263,11 @@ def insert_batch(session, models_batch):
 
         except Exception as e:
             logger.error(f"Error inserting model {model.id}: {e}")
+            if strict:
+                raise
 
 
-def update_derivative_counts(engine):
+def update_derivative_counts(engine, strict=False):
     """Update derivative counts for base models"""
     logger.info("Updating derivative counts...")
 
@@ -252,45 +275,343 @@ def update_derivative_counts(engine):
     session = Session()
 
     try:
-        # Update counts using raw SQL for efficiency
-        session.execute("""
-            UPDATE models
-            SET derivative_count = (
-                SELECT COUNT(*)
-                FROM base_model_relations
-                WHERE base_model_relations.base_model_id = models.id
-            )
-        """)
+        # Single set-based UPDATE; built with Core so it follows the engine's schema translation
+        derivative_count = (
+            select(func.count(BaseModelRelation.id))
+            .where(BaseModelRelation.base_model_id == Model.id)
+            .scalar_subquery()
+        )
+        session.execute(update(Model).values(derivative_count=derivative_count))
         session.commit()
         logger.info("Derivative counts updated")
     except Exception as e:
         logger.error(f"Error updating derivative counts: {e}")
         session.rollback()
+        if strict:
+            raise
     finally:
         session.close()
 
 
+def next_generation(engine):
+    """Return the generation number for the catalog about to be loaded"""
+    if not inspect(engine).has_table(CatalogGeneration.__tablename__):
+        return 1
+    with engine.connect() as conn:
+        return (conn.execute(select(func.max(CatalogGeneration.id))).scalar() or 0) + 1
+
+
+def catalog_tables():
+    """Tables rebuilt on every load; catalog_generations keeps its history across reloads"""
+    return [table for table in Base.metadata.sorted_tables if table is not CatalogGeneration.__table__]
+
+
+def collect_stats(engine):
+    """Count rows and compute summary statistics for a loaded catalog"""
+    logger.info("Computing catalog statistics...")
+
+    with engine.connect() as conn:
+        pipeline_counts = conn.execute(
+            select(Model.pipeline_tag, func.count())
+            .where(Model.pipeline_tag.isnot(None))
+            .group_by(Model.pipeline_tag)
+            .order_by(func.count().desc())
+            .limit(20)
+        ).all()
+
+        return {
+            "loaded_at": datetime.utcnow(),
+            "total_models": conn.scalar(select(func.count()).select_from(Model)),
+            "total_tags": conn.scalar(select(func.count()).select_from(ModelTag)),
+            "total_base_model_relations": conn.scalar(select(func.count()).select_from(BaseModelRelation)),
+            "total_dataset_relations": conn.scalar(select(func.count()).select_from(DatasetRelation)),
+            "stats": {
+                "models_with_base_model": conn.scalar(
+                    select(func.count()).select_from(Model).where(Model.has_base_model.is_(True))
+                ),
+                "pipeline_tags": {tag: count for tag, count in pipeline_counts},
+            },
+        }
+
+
+def record_generation(conn, generation, info):
+    """Append the generation to catalog_generations (on conn, so it can join the swap transaction)"""
+    conn.execute(CatalogGeneration.__table__.insert().values(id=generation, **info))
+    logger.info(f"Generation {generation}: {info['total_models']} models, {info['total_tags']} tags")
+
+
+def create_shadow_schema(engine):
+    """Create empty catalog tables in the shadow schema, without secondary indexes"""
+    shadow = settings.SHADOW_SCHEMA
+    quoted = engine.dialect.identifier_preparer.quote_schema(shadow)
+    logger.info(f"Creating shadow schema {shadow}...")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {quoted} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {quoted}"))
+
+        shadow_conn = conn.execution_options(schema_translate_map={None: shadow})
+        for table in catalog_tables():
+            shadow_conn.execute(CreateTable(table))
+
+    return shadow_engine_for(engine)
+
+
+def drop_shadow(engine):
+    """Remove a shadow catalog and its similarity index"""
+    shadow = engine.dialect.identifier_preparer.quote_schema(settings.SHADOW_SCHEMA)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {shadow} CASCADE"))
+    if os.path.exists(shadow_index_path()):
+        os.remove(shadow_index_path())
+
+
+def shadow_engine_for(engine):
+    """Return an engine whose statements target the shadow tables"""
+    return engine.execution_options(schema_translate_map={None: settings.SHADOW_SCHEMA})
+
+
+def mark_shadow_validated(engine):
+    """Record on the shadow schema that it passed validation"""
+    shadow = engine.dialect.identifier_preparer.quote_schema(settings.SHADOW_SCHEMA)
+    with engine.begin() as conn:
+        conn.execute(text(f"COMMENT ON SCHEMA {shadow} IS '{VALIDATED_COMMENT}'"))
+
+
+def shadow_is_validated(engine):
+    """True if a validated shadow catalog from an earlier --reload is waiting to be swapped in"""
+    with engine.connect() as conn:
+        comment = conn.execute(
+            text("SELECT obj_description(oid, 'pg_namespace') FROM pg_namespace WHERE nspname = :name"),
+            {"name": settings.SHADOW_SCHEMA}
+        ).scalar()
+    return comment == VALIDATED_COMMENT
+
+
+def create_indexes(engine):
+    """Build secondary indexes once the bulk load is done"""
+    logger.info("Creating indexes...")
+
+    with engine.begin() as conn:
+        for table in catalog_tables():
+            for index in table.indexes:
+                conn.execute(CreateIndex(index))
+
+    logger.info("Indexes created")
+
+
+def validate_load(info, parsed):
+    """Refuse to swap in a shadow catalog whose row counts don't match what was parsed"""
+    if not info["total_models"]:
+        raise RuntimeError("Shadow catalog is empty")
+
+    mismatches = [
+        f"{key} {info[key]} loaded but {count} parsed"
+        for key, count in parsed.items()
+        if info[key] != count
+    ]
+    if mismatches:
+        raise RuntimeError(f"Shadow catalog row counts differ: {'; '.join(mismatches)}")
+
+
+def swap_in_shadow(engine, generation, info):
+    """Replace the live tables with the shadow tables and record the generation, in one short transaction"""
+    preparer = engine.dialect.identifier_preparer
+    shadow = preparer.quote_schema(settings.SHADOW_SCHEMA)
+    retired = preparer.quote_schema(settings.RETIRED_SCHEMA)
+    tables = [preparer.quote(table.name) for table in catalog_tables()]
+    live = {preparer.quote(name) for name in inspect(engine).get_table_names()}
+
+    # The generation history stays in public and is only appended to
+    CatalogGeneration.__table__.create(engine, checkfirst=True)
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {retired} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {retired}"))
+
+    for attempt in range(1, settings.SWAP_ATTEMPTS + 1):
+        logger.info(f"Swapping shadow catalog in (attempt {attempt}/{settings.SWAP_ATTEMPTS})...")
+        try:
+            with engine.begin() as conn:
+                # While LOCK TABLE waits, every new reader of these tables queues behind it,
+                # so each attempt can stall readers for up to SWAP_LOCK_TIMEOUT. Keep that short
+                # and retry between attempts, when readers run freely, instead of waiting longer
+                conn.execute(text(f"SET LOCAL lock_timeout = '{settings.SWAP_LOCK_TIMEOUT}'"))
+
+                locked = [f"public.{name}" for name in tables if name in live]
+                if locked:
+                    conn.execute(text(f"LOCK TABLE {', '.join(locked)} IN ACCESS EXCLUSIVE MODE"))
+
+                for name in tables:
+                    if name in live:
+                        conn.execute(text(f"ALTER TABLE public.{name} SET SCHEMA {retired}"))
+                    conn.execute(text(f"ALTER TABLE {shadow}.{name} SET SCHEMA public"))
+
+                record_generation(conn, generation, info)
+            break
+        except OperationalError as e:
+            if attempt == settings.SWAP_ATTEMPTS:
+                logger.error(
+                    f"Swap failed after {attempt} attempts: {e.orig}. The validated shadow catalog was kept "
+                    f"in schema {settings.SHADOW_SCHEMA}; run init_db.py --swap-only to retry without reloading"
+                )
+                raise
+            delay = settings.SWAP_RETRY_DELAY * 2 ** (attempt - 1)
+            logger.warning(f"Swap attempt {attempt} failed ({e.orig}); retrying in {delay:g}s")
+            time.sleep(delay)
+    logger.info("Swap complete")
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {retired} CASCADE"))
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {shadow} CASCADE"))
+
+
+def iter_model_features(data_file):
+    """Yield (model_id, feature_set) pairs from the JSONL file"""
+    with open(data_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                data = json.loads(line.strip())
+            except Exception:
+                continue
+            if data.get('id'):
+                yield data['id'], model_features(data.get('tags'), data.get('pipeline_tag'))
+
+
+def build_similarity_index(data_file):
+    """Build the MinHash/LSH similarity index from the JSONL file"""
+    logger.info("Building similarity index...")
+
+    index = MinHashLSHIndex.build(
+        iter_model_features(data_file),
+        num_perm=settings.SIMILARITY_NUM_PERM,
+        num_bands=settings.SIMILARITY_BANDS,
+    )
+    logger.info(f"Similarity index built ({len(index)} models)")
+    return index
+
+
+def check_similarity_settings():
+    """Fail fast on index parameters that would only be rejected after the load"""
+    if settings.SIMILARITY_BANDS < 1 or settings.SIMILARITY_NUM_PERM % settings.SIMILARITY_BANDS:
+        logger.error(
+            f"SIMILARITY_BANDS ({settings.SIMILARITY_BANDS}) must evenly divide "
+            f"SIMILARITY_NUM_PERM ({settings.SIMILARITY_NUM_PERM})"
+        )
+        sys.exit(1)
+
+
+def shadow_index_path():
+    """Where the similarity index for a catalog not yet published is kept"""
+    return f"{settings.SIMILARITY_INDEX_PATH}.shadow"
+
+
+def publish_catalog(generation, info):
+    """Move the shadow similarity index into place, then tell running API processes about the new generation"""
+    os.replace(shadow_index_path(), settings.SIMILARITY_INDEX_PATH)
+    logger.info(f"Similarity index written to {settings.SIMILARITY_INDEX_PATH}")
+
+    write_generation_marker(generation, loaded_at=info["loaded_at"], total_models=info["total_models"])
+    logger.info(f"Catalog generation {generation} published")
+
+
+def reload_catalog(data_file):
+    """Load into the shadow schema, validate, then swap it in without downtime"""
+    engine = create_db_engine()
+    generation = next_generation(engine)
+
+    # Any failure before the swap aborts the reload; the live catalog is never touched
+    try:
+        shadow_engine = create_shadow_schema(engine)
+        parsed = load_data(shadow_engine, data_file, strict=True)
+        create_indexes(shadow_engine)
+        update_derivative_counts(shadow_engine, strict=True)
+        info = collect_stats(shadow_engine)
+        validate_load(info, parsed)
+
+        # Built from the same file as the shadow tables and kept with them until the swap
+        build_similarity_index(data_file).save(shadow_index_path())
+        mark_shadow_validated(engine)
+    except Exception as e:
+        logger.error(f"Building the shadow catalog failed, live catalog left untouched: {e}")
+        try:
+            drop_shadow(engine)
+            logger.info(f"Dropped the partial shadow schema {settings.SHADOW_SCHEMA}")
+        except Exception as drop_error:
+            logger.error(f"Could not drop shadow schema {settings.SHADOW_SCHEMA}: {drop_error}")
+        sys.exit(1)
+
+    swap_and_publish(engine, generation, info)
+
+
+def swap_only():
+    """Swap in a validated shadow catalog kept by an earlier --reload whose swap failed"""
+    engine = create_db_engine()
+    if not shadow_is_validated(engine) or not os.path.exists(shadow_index_path()):
+        logger.error(f"No validated shadow catalog in schema {settings.SHADOW_SCHEMA}; run init_db.py --reload")
+        sys.exit(1)
+
+    swap_and_publish(engine, next_generation(engine), collect_stats(shadow_engine_for(engine)))
+
+
+def swap_and_publish(engine, generation, info):
+    """Swap the shadow catalog in and publish it with its similarity index"""
+    try:
+        swap_in_shadow(engine, generation, info)
+    except OperationalError:
+        sys.exit(1)
+    publish_catalog(generation, info)
+
+
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Load the JSONL catalog into PostgreSQL")
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="load into a shadow schema and atomically swap it in, keeping the live catalog readable"
+    )
+    parser.add_argument(
+        "--swap-only",
+        action="store_true",
+        help="retry swapping in the shadow catalog kept by a --reload whose swap failed"
+    )
+    args = parser.parse_args()
+
     logger.info("=" * 60)
     logger.info("AI Model Catalog - Database Initialization")
     logger.info("=" * 60)
 
-    # Check if data file exists
+    # Check if data file exists (--swap-only publishes what an earlier --reload built)
     data_file = settings.DATA_FILE_PATH
-    if not os.path.exists(data_file):
+    if not args.swap_only and not os.path.exists(data_file):
         logger.error(f"Data file not found: {data_file}")
         logger.error("Please place hf_models.jsonl in the data directory")
         sys.exit(1)
 
-    # Initialize database
-    engine = init_database()
+    check_similarity_settings()
 
-    # Load data
-    load_data(engine, data_file)
-
-    # Update derivative counts
-    update_derivative_counts(engine)
+    if args.swap_only:
+        swap_only()
+    elif args.reload:
+        reload_catalog(data_file)
+    else:
+        # Initialize database
+        engine = init_database()
+        generation = next_generation(engine)
+
+        # Load data
+        load_data(engine, data_file)
+
+        # Update derivative counts
+        update_derivative_counts(engine)
+
+        # Record stats, build similarity index and publish the generation
+        info = collect_stats(engine)
+        with engine.begin() as conn:
+            record_generation(conn, generation, info)
+        build_similarity_index(data_file).save(shadow_index_path())
+        publish_catalog(generation, info)
 
     logger.info("=" * 60)
     logger.info("Database initialization complete!")
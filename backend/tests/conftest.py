@@ -0,0 +1,21 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from app.core.config import settings
+from app.services import catalog, similarity
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point every data-file setting at a temporary directory and reset in-process caches"""
+    monkeypatch.setattr(settings, "SIMILARITY_INDEX_PATH", str(tmp_path / "similarity_index.npz"))
+    monkeypatch.setattr(settings, "CATALOG_GENERATION_PATH", str(tmp_path / "catalog_generation.json"))
+    monkeypatch.setattr(similarity, "_index", None)
+    monkeypatch.setattr(similarity, "_requested_generation", object())
+    monkeypatch.setattr(similarity, "_loader", None)
+    monkeypatch.setattr(catalog, "_generation", None)
+    monkeypatch.setattr(catalog, "_marker_mtime", None)
+    return tmp_path
@@ -0,0 +1,42 @@
+"""
+Tests for catalog generation tracking
+"""
+
+import os
+
+from app.services.catalog import current_generation, write_generation_marker
+
+
+def test_no_marker_means_no_generation(data_dir):
+    assert current_generation() is None
+
+
+def test_marker_round_trip(data_dir):
+    write_generation_marker(1, total_models=10)
+    assert current_generation() == 1
+
+    write_generation_marker(2, total_models=12)
+    path = str(data_dir / "catalog_generation.json")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))  # guarantee a new mtime
+    assert current_generation() == 2
+
+
+def test_unchanged_mtime_skips_reread(data_dir):
+    write_generation_marker(1)
+    assert current_generation() == 1
+
+    path = data_dir / "catalog_generation.json"
+    mtime = os.stat(path).st_mtime_ns
+    path.write_text('{"generation": 7}')
+    os.utime(path, ns=(mtime, mtime))
+    assert current_generation() == 1
+
+
+def test_unreadable_marker_keeps_previous_generation(data_dir):
+    write_generation_marker(3)
+    assert current_generation() == 3
+
+    path = data_dir / "catalog_generation.json"
+    path.write_text("not json")
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert current_generation() == 3
@@ -0,0 +1,231 @@
+"""
+Tests for the catalog load and validation steps of init_db.py
+"""
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import init_db  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.models import Base, CatalogGeneration  # noqa: E402
+from app.services.catalog import current_generation  # noqa: E402
+
+RECORDS = [
+    {"id": "org/base", "author": "org", "pipeline_tag": "text-generation",
+     "tags": ["transformers", "license:mit", "dataset:squad", "en"]},
+    {"id": "org/finetune", "author": "org", "pipeline_tag": "text-generation",
+     "tags": ["license:mit", "base_model:finetune:org/base", "dataset:squad", "dataset:glue"]},
+    {"id": "other/quant", "author": "other",
+     "tags": ["base_model:quantized:org/base"]},
+]
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "hf_models.jsonl"
+    path.write_text("".join(json.dumps(record) + "\n" for record in RECORDS) + "not json\n")
+    return str(path)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def test_loaded_counts_match_parsed_counts(engine, data_file):
+    parsed = init_db.load_data(engine, data_file, strict=True)
+    init_db.update_derivative_counts(engine, strict=True)
+    info = init_db.collect_stats(engine)
+
+    assert parsed == {
+        "total_models": 3,
+        "total_tags": 9,
+        "total_base_model_relations": 2,
+        "total_dataset_relations": 3,
+    }
+    init_db.validate_load(info, parsed)
+    assert info["stats"]["models_with_base_model"] == 2
+    assert info["stats"]["pipeline_tags"] == {"text-generation": 2}
+
+
+def test_validate_load_rejects_missing_rows(engine, data_file):
+    parsed = init_db.load_data(engine, data_file, strict=True)
+    info = init_db.collect_stats(engine)
+
+    with pytest.raises(RuntimeError, match="total_tags"):
+        init_db.validate_load(dict(info, total_tags=info["total_tags"] - 1), parsed)
+    with pytest.raises(RuntimeError, match="empty"):
+        init_db.validate_load(dict(info, total_models=0), parsed)
+
+
+def test_strict_load_aborts_on_insert_error(engine, data_file):
+    init_db.load_data(engine, data_file)
+
+    # Loading the same ids again violates the primary key
+    with pytest.raises(Exception):
+        init_db.load_data(engine, data_file, strict=True)
+
+
+def test_strict_derivative_count_failure_raises():
+    engine = create_engine("sqlite://")  # no tables
+
+    init_db.update_derivative_counts(engine)
+    with pytest.raises(Exception):
+        init_db.update_derivative_counts(engine, strict=True)
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def execute(self, statement, *args):
+        sql = str(statement)
+        self.engine.executed.append(sql)
+        if "lock_timeout" in sql and self.engine.swap_failures:
+            self.engine.swap_failures -= 1
+            raise OperationalError(sql, {}, Exception("canceling statement due to lock timeout"))
+        return SimpleNamespace(scalar=lambda: self.engine.schema_comment)
+
+
+class FakeEngine:
+    """Records the SQL it is given; the first swap_failures swap attempts hit lock_timeout"""
+
+    dialect = postgresql.dialect()
+
+    def __init__(self, swap_failures=0, schema_comment=None):
+        self.swap_failures = swap_failures
+        self.schema_comment = schema_comment
+        self.executed = []
+
+    @contextmanager
+    def begin(self):
+        yield FakeConnection(self)
+
+    connect = begin
+
+    def execution_options(self, **options):
+        return self
+
+    def ran(self, fragment):
+        return [sql for sql in self.executed if fragment in sql]
+
+
+@pytest.fixture
+def swap_env(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(init_db.time, "sleep", sleeps.append)
+    monkeypatch.setattr(init_db, "inspect", lambda engine: SimpleNamespace(
+        get_table_names=lambda: [table.name for table in Base.metadata.sorted_tables]
+    ))
+    monkeypatch.setattr(CatalogGeneration.__table__, "create", lambda *args, **kwargs: None)
+    monkeypatch.setattr(settings, "SWAP_ATTEMPTS", 4)
+    monkeypatch.setattr(settings, "SWAP_RETRY_DELAY", 0.5)
+    return sleeps
+
+
+INFO = {
+    "loaded_at": datetime(2026, 1, 1),
+    "total_models": 3,
+    "total_tags": 9,
+    "total_base_model_relations": 2,
+    "total_dataset_relations": 3,
+    "stats": {},
+}
+
+
+def test_swap_retries_with_backoff(swap_env):
+    engine = FakeEngine(swap_failures=2)
+
+    init_db.swap_in_shadow(engine, 2, INFO)
+
+    assert len(engine.ran("lock_timeout")) == 3
+    assert swap_env == [0.5, 1.0]
+    assert len(engine.ran("INSERT INTO catalog_generations")) == 1
+    assert engine.ran("DROP SCHEMA IF EXISTS catalog_shadow")
+
+
+def test_swap_keeps_shadow_after_last_failure(swap_env):
+    engine = FakeEngine(swap_failures=10)
+
+    with pytest.raises(OperationalError):
+        init_db.swap_in_shadow(engine, 2, INFO)
+
+    assert len(engine.ran("lock_timeout")) == 4
+    assert swap_env == [0.5, 1.0, 2.0]
+    assert not engine.ran("DROP SCHEMA IF EXISTS catalog_shadow")
+    assert not engine.ran("INSERT INTO catalog_generations")
+
+
+def test_swap_moves_catalog_tables_but_not_generation_history(swap_env):
+    engine = FakeEngine()
+
+    init_db.swap_in_shadow(engine, 2, INFO)
+
+    moved = engine.ran("SET SCHEMA public")
+    assert len(moved) == len(init_db.catalog_tables())
+    assert not any("catalog_generations" in sql for sql in engine.ran("ALTER TABLE"))
+    assert not any("catalog_generations" in sql for sql in engine.ran("LOCK TABLE"))
+
+
+def test_generation_history_is_appended(engine):
+    for _ in range(3):
+        generation = init_db.next_generation(engine)
+        with engine.begin() as conn:
+            init_db.record_generation(conn, generation, dict(INFO, loaded_at=datetime.utcnow()))
+
+    with engine.connect() as conn:
+        ids = conn.execute(select(CatalogGeneration.id).order_by(CatalogGeneration.id)).scalars().all()
+    assert ids == [1, 2, 3]
+    assert init_db.next_generation(engine) == 4
+
+
+def test_shadow_is_validated():
+    assert init_db.shadow_is_validated(FakeEngine(schema_comment=init_db.VALIDATED_COMMENT))
+    assert not init_db.shadow_is_validated(FakeEngine(schema_comment=None))
+
+
+@pytest.mark.parametrize("comment, index_exists", [
+    (None, True),
+    (init_db.VALIDATED_COMMENT, False),
+])
+def test_swap_only_refuses_without_validated_shadow(data_dir, monkeypatch, comment, index_exists):
+    engine = FakeEngine(schema_comment=comment)
+    monkeypatch.setattr(init_db, "create_db_engine", lambda: engine)
+    if index_exists:
+        open(init_db.shadow_index_path(), "wb").close()
+
+    with pytest.raises(SystemExit):
+        init_db.swap_only()
+    assert not engine.ran("SET SCHEMA")
+
+
+def test_swap_only_publishes_saved_index(data_dir, monkeypatch):
+    engine = FakeEngine(schema_comment=init_db.VALIDATED_COMMENT)
+    swapped = []
+    monkeypatch.setattr(init_db, "create_db_engine", lambda: engine)
+    monkeypatch.setattr(init_db, "next_generation", lambda engine: 5)
+    monkeypatch.setattr(init_db, "collect_stats", lambda engine: INFO)
+    monkeypatch.setattr(init_db, "swap_in_shadow", lambda *args: swapped.append(args[1:]))
+    with open(init_db.shadow_index_path(), "wb") as f:
+        f.write(b"index")
+
+    init_db.swap_only()
+
+    assert swapped == [(5, INFO)]
+    with open(settings.SIMILARITY_INDEX_PATH, "rb") as f:
+        assert f.read() == b"index"
+    assert not os.path.exists(init_db.shadow_index_path())
+    assert current_generation() == 5
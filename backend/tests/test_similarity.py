@@ -0,0 +1,193 @@
+"""
+Tests for the MinHash/LSH similarity index
+"""
+
+import random
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import similarity
+from app.services.catalog import write_generation_marker
+from app.services.similarity import MinHashLSHIndex, jaccard, measure_recall, model_features
+
+
+def clustered_catalog(n=2000, seed=7):
+    """Models drawn from 40 tag clusters plus one random tag: strong neighbours exist"""
+    rng = random.Random(seed)
+    vocab = [f"dataset:d{i}" for i in range(400)]
+    clusters = [rng.sample(vocab, 10) for _ in range(40)]
+    return {
+        f"org/model-{i}": set(rng.sample(rng.choice(clusters), 6)) | {rng.choice(vocab)}
+        for i in range(n)
+    }
+
+
+def weak_overlap_catalog(n=2000, seed=7):
+    """Independent random tag sets: even the best neighbours share only a few tags"""
+    rng = random.Random(seed)
+    vocab = [f"dataset:d{i}" for i in range(100)]
+    return {f"org/model-{i}": set(rng.sample(vocab, 8)) for i in range(n)}
+
+
+def recall_at_10(feature_sets, num_perm, num_bands):
+    index = MinHashLSHIndex.build(feature_sets.items(), num_perm=num_perm, num_bands=num_bands)
+    return measure_recall(index, feature_sets, list(feature_sets)[:100], k=10)
+
+
+@pytest.mark.parametrize("catalog", [clustered_catalog, weak_overlap_catalog])
+def test_more_bands_gives_higher_recall(catalog):
+    feature_sets = catalog()
+    recalls = [recall_at_10(feature_sets, 64, bands)["recall"] for bands in (8, 16, 32)]
+    assert recalls[0] < recalls[1] < recalls[2]
+
+
+def test_recall_against_exact_jaccard():
+    # Default settings (64 perms, 16 bands) find most neighbours when they are
+    # genuinely similar, but little when overlap is weak: recall depends on the data
+    assert recall_at_10(clustered_catalog(), 64, 16)["recall"] >= 0.8
+    assert recall_at_10(weak_overlap_catalog(), 64, 16)["recall"] < 0.3
+    assert recall_at_10(clustered_catalog(), 64, 32)["recall"] >= 0.95
+
+
+def mean_candidates(feature_sets, num_perm, num_bands):
+    index = MinHashLSHIndex.build(feature_sets.items(), num_perm=num_perm, num_bands=num_bands)
+    scanned = [len(index.candidates(model_id)) for model_id in list(feature_sets)[:100]]
+    return sum(scanned) / len(scanned)
+
+
+@pytest.mark.parametrize("catalog", [clustered_catalog, weak_overlap_catalog])
+def test_more_bands_scans_more_candidates(catalog):
+    # The cost side of the tradeoff: recall from extra bands is paid for in candidates scanned
+    feature_sets = catalog()
+    scanned = [mean_candidates(feature_sets, 64, bands) for bands in (8, 16, 32)]
+    assert scanned[0] < scanned[1] < scanned[2]
+
+
+def test_lookup_scans_a_small_part_of_the_catalog():
+    feature_sets = clustered_catalog()
+    assert mean_candidates(feature_sets, 64, 16) < 0.1 * len(feature_sets)
+
+
+@pytest.mark.parametrize("catalog", [clustered_catalog, weak_overlap_catalog])
+def test_lsh_lookup_is_faster_than_exact_jaccard(catalog):
+    result = recall_at_10(catalog(n=5000), 64, 16)
+    assert result["lsh_ms"] < result["exact_ms"]
+
+
+def test_scores_estimate_jaccard():
+    feature_sets = clustered_catalog(n=500)
+    index = MinHashLSHIndex.build(feature_sets.items(), num_perm=128, num_bands=32)
+    query_id = "org/model-0"
+    for other_id, score in index.query(query_id, k=10):
+        assert score == pytest.approx(jaccard(feature_sets[query_id], feature_sets[other_id]), abs=0.2)
+
+
+def test_max_bucket_caps_candidates():
+    feature_sets = {f"org/model-{i}": {"pipeline_tag:text-generation"} for i in range(50)}
+    index = MinHashLSHIndex.build(feature_sets.items(), num_perm=16, num_bands=4)
+    assert len(index.candidates("org/model-0")) == 49
+    assert len(index.candidates("org/model-0", max_bucket=10)) <= 10
+
+
+def test_unknown_and_empty_models():
+    index = MinHashLSHIndex.build(
+        [("org/a", {"license:mit"}), ("org/b", {"license:mit"}), ("org/empty", set())],
+        num_perm=16,
+        num_bands=4,
+    )
+    assert "org/empty" not in index
+    assert len(index) == 2
+    assert index.query("org/empty") == []
+    assert index.query("org/missing") == []
+    assert index.query("org/a") == [("org/b", 1.0)]
+
+
+def test_empty_index():
+    index = MinHashLSHIndex.build([], num_perm=16, num_bands=4)
+    assert len(index) == 0
+    assert index.query("org/a") == []
+
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        MinHashLSHIndex.build([("org/a", {"license:mit"})], num_perm=64, num_bands=10)
+
+
+def test_save_load_round_trip(tmp_path):
+    feature_sets = clustered_catalog(n=300)
+    index = MinHashLSHIndex.build(feature_sets.items(), num_perm=32, num_bands=8, seed=3)
+    path = tmp_path / "index.npz"
+    index.save(str(path))
+
+    loaded = MinHashLSHIndex.load(str(path))
+    assert loaded.ids == index.ids
+    assert (loaded.signatures == index.signatures).all()
+    assert (loaded.num_bands, loaded.seed) == (8, 3)
+    for model_id in list(feature_sets)[:20]:
+        assert loaded.query(model_id, k=5) == index.query(model_id, k=5)
+
+
+def test_model_features_keeps_task_datasets_languages_and_licenses():
+    tags = ["transformers", "region:us", "endpoints_compatible", "en", "license:mit", "dataset:squad"]
+    assert model_features(tags, "question-answering") == {
+        "en", "license:mit", "dataset:squad", "pipeline_tag:question-answering"
+    }
+    assert model_features(None) == set()
+
+
+def test_similar_endpoint(data_dir):
+    client = TestClient(app)
+
+    response = client.get("/api/v1/models/org/a/similar")
+    assert response.status_code == 200
+    assert response.json()["results"] == []
+    assert "not built" in response.json()["message"]
+
+    MinHashLSHIndex.build(
+        [
+            ("org/a", {"license:mit", "dataset:squad", "en"}),
+            ("org/b", {"license:mit", "dataset:squad", "en"}),
+            ("org/c", {"license:apache-2.0", "de"}),
+        ],
+        num_perm=64,
+        num_bands=32,
+    ).save(str(data_dir / "similarity_index.npz"))
+    similarity.load_similarity_index()
+
+    response = client.get("/api/v1/models/org/a/similar", params={"limit": 5})
+    assert response.status_code == 200
+    assert response.json() == {"model_id": "org/a", "results": [{"id": "org/b", "score": 1.0}]}
+
+    assert client.get("/api/v1/models/org/missing/similar").json()["results"] == []
+    assert client.get("/api/v1/models/org/a/similar", params={"limit": 0}).status_code == 422
+
+
+def test_new_generation_loads_in_background(data_dir, monkeypatch):
+    path = str(data_dir / "similarity_index.npz")
+    MinHashLSHIndex.build([("org/a", {"license:mit"})], num_perm=16, num_bands=4).save(path)
+    old = similarity.load_similarity_index()
+
+    MinHashLSHIndex.build(
+        [("org/a", {"license:mit"}), ("org/b", {"license:mit"})], num_perm=16, num_bands=4
+    ).save(path)
+    write_generation_marker(2)
+
+    release = threading.Event()
+    real_load = MinHashLSHIndex.load
+
+    def slow_load(load_path):
+        release.wait(5)
+        return real_load(load_path)
+
+    monkeypatch.setattr(MinHashLSHIndex, "load", staticmethod(slow_load))
+
+    # The request that notices the new generation is served from the old index
+    assert similarity.get_similarity_index() is old
+    assert similarity.get_similarity_index() is old
+
+    release.set()
+    similarity._loader.join(5)
+    assert len(similarity.get_similarity_index()) == 2
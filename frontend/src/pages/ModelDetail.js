@@ -20,7 +20,7 @@ import {
   Code,
   Dataset,
 } from '@mui/icons-material';
-import { getModel } from '../services/api';
+import { getModel, getSimilarModels } from '../services/api';
 
 function ModelDetail() {
   const { modelId } = useParams();
@@ -28,9 +28,11 @@ function ModelDetail() {
   const [model, setModel] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [similar, setSimilar] = useState([]);
 
   useEffect(() => {
     loadModel();
+    loadSimilar();
   }, [modelId]);
 
   const loadModel = async () => {
@@ -52,6 +54,17 @@ function ModelDetail() {
     }
   };
 
+  const loadSimilar = async () => {
+    setSimilar([]);
+
+    try {
+      const data = await getSimilarModels(decodeURIComponent(modelId));
+      setSimilar(data.results || []);
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   if (loading) {
     return (
       <Container sx={{ display: 'flex', justifyContent: 'center', mt: 8 }}>
@@ -235,6 +248,27 @@ function ModelDetail() {
           </Box>
         )}
 
+        {/* Similar Models */}
+        {similar.length > 0 && (
+          <Box sx={{ mb: 3 }}>
+            <Typography variant="h6" gutterBottom>
+              Similar Models
+            </Typography>
+            <Box sx={{ display: 'flex', gap: 1, flexWrap: 'wrap' }}>
+              {similar.map((item) => (
+                <Chip
+                  key={item.id}
+                  label={item.id}
+                  onClick={() => navigate(`/model/${encodeURIComponent(item.id)}`)}
+                  clickable
+                  variant="outlined"
+                  size="small"
+                />
+              ))}
+            </Box>
+          </Box>
+        )}
+
         {/* HuggingFace Link */}
         <Button
           variant="contained"
@@ -30,6 +30,16 @@ export const getModel = async (modelId) => {
   }
 };
 
+export const getSimilarModels = async (modelId, limit = 10) => {
+  try {
+    const response = await api.get(`/models/${encodeURIComponent(modelId)}/similar`, { params: { limit } });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching similar models:', error);
+    throw error;
+  }
+};
+
 export const getTrending = async (limit = 20) => {
   try {
     const response = await api.get('/trending', { params: { limit } });
@@ -2,11 +2,28 @@
 import os
 import json
 import time
-from huggingface_hub import HfApi
+import argparse
+from datetime import datetime, timedelta, timezone
 
 
 RATE_LIMIT_SLEEP = 0.2  # adjust if rate-limited
 
+# High-water marks (last_modified + id) per listing, used by --delta
+STATE_FILE = "hf_harvest_state.json"
+
+# (name, HfApi method, snapshot file)
+LISTINGS = [
+    ("models", "list_models", "hf_models.jsonl"),
+    ("datasets", "list_datasets", "hf_datasets.jsonl"),
+    ("spaces", "list_spaces", "hf_spaces.jsonl"),
+]
+
+MIN_TIMESTAMP = datetime.min.replace(tzinfo=timezone.utc)
+
+# A full harvest is unordered and can run for days, so its high-water mark is
+# the time it started (less this margin for clock skew), not the newest entry
+FULL_HARVEST_MARGIN = timedelta(minutes=10)
+
 
 def obj_to_dict(obj):
     """Convert HF metadata objects to a clean dict."""
@@ -24,45 +41,187 @@ def obj_to_dict(obj):
     return out
 
 
-def dump_iter(name, iterator, output_file):
+def parse_timestamp(value):
+    """Parse a datetime or ISO string into an aware UTC datetime (None if unparseable)."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        ts = value
+    else:
+        try:
+            ts = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts
+
+
+def record_mark(record):
+    """Return the (last_modified, id) of a record; missing timestamps sort oldest."""
+    ts = parse_timestamp(record.get("last_modified") or record.get("lastModified"))
+    return ts or MIN_TIMESTAMP, record.get("id")
+
+
+def load_state(path):
+    """Load high-water marks as {name: (last_modified, id)}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    state = {}
+    for name, mark in raw.items():
+        ts = parse_timestamp(mark.get("last_modified"))
+        if ts is None:
+            raise ValueError(f"{path}: invalid last_modified for {name!r}: {mark.get('last_modified')!r}")
+        state[name] = (ts, mark.get("id"))
+    return state
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(
+            {name: {"last_modified": ts.isoformat(), "id": id_} for name, (ts, id_) in state.items()},
+            f,
+            indent=2,
+        )
+    os.replace(tmp_path, path)
+
+
+def dump_iter(name, iterator, output_file, stop_at=None):
+    """
+    Write each item as a JSON line and return the newest (last_modified, id) seen.
+
+    With stop_at, the iterator must yield newest-first: writing stops at the
+    first entry older than the mark, and the mark's own entry is skipped.
+    """
     count = 0
+    newest = None
     with open(output_file, "w", encoding="utf-8") as f:
         for item in iterator:
             record = obj_to_dict(item)
+            mark = record_mark(record)
+            if stop_at is not None:
+                if mark[0] < stop_at[0]:
+                    break
+                if mark == stop_at:
+                    continue
             f.write(json.dumps(record, default=str) + "\n")
+            if mark[0] != MIN_TIMESTAMP and (newest is None or mark > newest):
+                newest = mark
             count += 1
             if count % 100 == 0:
                 print(f"[{name}] wrote {count} entries...")
             time.sleep(RATE_LIMIT_SLEEP)
     print(f"[{name}] DONE -> {output_file} ({count} total)")
+    return newest
+
+
+def merge_delta(snapshot_file, delta_file):
+    """
+    Merge a delta file into the snapshot, deduplicated by id.
+
+    The entry with the newest last_modified wins across both files (the delta
+    on ties, the later line among snapshot copies). A first pass over the
+    snapshot finds its newest copy of each id; the merged entry is written at
+    that copy's position, and ids new in the delta are appended.
+    """
+    delta = {}
+    with open(delta_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            mark = record_mark(json.loads(line))
+            current = delta.get(mark[1])
+            if current is None or mark[0] > current[0]:
+                delta[mark[1]] = (mark[0], line)
+
+    newest = {}
+    with open(snapshot_file, "r", encoding="utf-8") as src:
+        for line_num, line in enumerate(src):
+            if not line.strip():
+                continue
+            ts, id_ = record_mark(json.loads(line))
+            current = newest.get(id_)
+            if current is None or ts >= current[0]:
+                newest[id_] = (ts, line_num)
+
+    replaced = 0
+    tmp_path = snapshot_file + ".tmp"
+    with open(snapshot_file, "r", encoding="utf-8") as src, open(tmp_path, "w", encoding="utf-8") as dst:
+        for line_num, line in enumerate(src):
+            if not line.strip():
+                continue
+            id_ = record_mark(json.loads(line))[1]
+            ts, winner = newest[id_]
+            if line_num != winner:
+                continue
+            entry = delta.pop(id_, None)
+            if entry is not None and entry[0] >= ts:
+                line = entry[1]
+                replaced += 1
+            dst.write(line if line.endswith("\n") else line + "\n")
+        for _, line in delta.values():
+            dst.write(line)
+    os.replace(tmp_path, snapshot_file)
+
+    return {"total": len(newest) + len(delta), "updated": replaced, "added": len(delta)}
+
+
+def harvest_delta(name, list_fn, snapshot_file, mark):
+    """
+    Fetch only entries modified since mark and merge them into the snapshot.
+
+    list_fn is called like HfApi.list_models and must honour sort/direction,
+    so the listing can stop as soon as it reaches already-seen entries.
+    Returns the new high-water mark.
+    """
+    delta_file = snapshot_file.replace(".jsonl", ".delta.jsonl")
+    newest = dump_iter(
+        name,
+        list_fn(sort="last_modified", direction=-1, full=True),
+        delta_file,
+        stop_at=mark,
+    )
+    stats = merge_delta(snapshot_file, delta_file)
+    print(f"[{name}] merged -> {snapshot_file} "
+          f"({stats['updated']} updated, {stats['added']} added, {stats['total']} total)")
+    return max(mark, newest) if newest else mark
 
 
 def main():
+    from huggingface_hub import HfApi
+
+    parser = argparse.ArgumentParser(description="Harvest HuggingFace Hub listings to JSONL")
+    parser.add_argument("--delta", action="store_true",
+                        help="fetch only entries changed since the last run and merge them into the snapshots")
+    args = parser.parse_args()
+
     token = os.getenv("HUGGINGFACE_HUB_TOKEN")
     api = HfApi(token=token)
 
     print("Using token?" , bool(token))
 
-    print("\n=== MODELS ===")
-    dump_iter(
-        "models",
-        api.list_models(full=True),
-        "hf_models.jsonl",
-    )
+    state = load_state(STATE_FILE)
 
-    print("\n=== DATASETS ===")
-    dump_iter(
-        "datasets",
-        api.list_datasets(full=True),
-        "hf_datasets.jsonl",
-    )
+    for name, method, output_file in LISTINGS:
+        print(f"\n=== {name.upper()} ===")
+        list_fn = getattr(api, method)
+        mark = state.get(name)
 
-    print("\n=== SPACES ===")
-    dump_iter(
-        "spaces",
-        api.list_spaces(full=True),
-        "hf_spaces.jsonl",
-    )
+        if args.delta and mark and os.path.exists(output_file):
+            newest = harvest_delta(name, list_fn, output_file, mark)
+        else:
+            if args.delta:
+                print(f"[{name}] no previous snapshot, doing a full harvest")
+            started = datetime.now(timezone.utc)
+            dump_iter(name, list_fn(full=True), output_file)
+            newest = (started - FULL_HARVEST_MARGIN, "")
+
+        if newest:
+            state[name] = newest
+            save_state(STATE_FILE, state)
 
     print("\nAll done!")
 
@@ -0,0 +1,9 @@
+"""
+Shared test setup for the top-level scripts
+"""
+
+import os
+import sys
+
+# Make hf.py importable from the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
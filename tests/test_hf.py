@@ -0,0 +1,155 @@
+"""
+Tests for hf.py delta harvesting against a local fake listing source
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import hf
+
+BASE = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeListing:
+    """In-memory stand-in for HfApi.list_models that records what it yielded"""
+
+    def __init__(self, entries):
+        self.entries = {entry.id: entry for entry in entries}
+        self.fetched = []
+
+    def touch(self, id_, hours, version):
+        self.entries[id_] = SimpleNamespace(id=id_, last_modified=BASE + timedelta(hours=hours), version=version)
+
+    def __call__(self, sort=None, direction=None, full=True):
+        entries = list(self.entries.values())
+        if sort == "last_modified":
+            entries.sort(key=lambda entry: entry.last_modified, reverse=direction == -1)
+        for entry in entries:
+            self.fetched.append(entry.id)
+            yield entry
+
+
+def entry(id_, hours, version=0):
+    return SimpleNamespace(id=id_, last_modified=BASE + timedelta(hours=hours), version=version)
+
+
+def read_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(hf, "RATE_LIMIT_SLEEP", 0)
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    listing = FakeListing([entry(f"m{i}", i) for i in range(10)])
+    path = str(tmp_path / "hf_models.jsonl")
+    hf.dump_iter("models", listing(full=True), path)
+    listing.fetched.clear()
+    return listing, path
+
+
+def test_delta_stops_at_mark_and_merges(snapshot):
+    listing, path = snapshot
+    mark = (BASE + timedelta(hours=9), "m9")
+    listing.touch("m3", 20, version=1)
+    listing.touch("m99", 21, version=1)
+
+    new_mark = hf.harvest_delta("models", listing, path, mark)
+
+    # Two changed entries, then the mark's own entry, then the first older one
+    assert listing.fetched == ["m99", "m3", "m9", "m8"]
+    assert new_mark == (BASE + timedelta(hours=21), "m99")
+    assert [r["id"] for r in read_jsonl(path.replace(".jsonl", ".delta.jsonl"))] == ["m99", "m3"]
+
+    records = read_jsonl(path)
+    assert len(records) == 11
+    assert {r["id"]: r["version"] for r in records}["m3"] == 1
+    assert records[-1]["id"] == "m99"
+
+
+def test_delta_with_no_changes_keeps_mark(snapshot):
+    listing, path = snapshot
+    mark = (BASE + timedelta(hours=9), "m9")
+
+    assert hf.harvest_delta("models", listing, path, mark) == mark
+    assert listing.fetched == ["m9", "m8"]
+    assert len(read_jsonl(path)) == 10
+
+
+def test_entries_sharing_the_mark_timestamp_are_refetched(snapshot):
+    listing, path = snapshot
+    listing.touch("m5", 9, version=1)
+    mark = (BASE + timedelta(hours=9), "m9")
+
+    hf.harvest_delta("models", listing, path, mark)
+
+    assert [r["id"] for r in read_jsonl(path.replace(".jsonl", ".delta.jsonl"))] == ["m5"]
+    assert {r["id"]: r["version"] for r in read_jsonl(path)}["m5"] == 1
+
+
+def test_merge_keeps_newest_entry_per_id(tmp_path):
+    snapshot_path = tmp_path / "snapshot.jsonl"
+    delta_path = tmp_path / "delta.jsonl"
+    snapshot_path.write_text("".join(json.dumps(r) + "\n" for r in [
+        {"id": "a", "last_modified": "2026-01-01T00:00:00+00:00", "v": "old"},
+        {"id": "b", "last_modified": "2026-01-05T00:00:00+00:00", "v": "snapshot"},
+        {"id": "a", "last_modified": "2026-01-01T00:00:00+00:00", "v": "duplicate"},
+    ]))
+    delta_path.write_text("".join(json.dumps(r) + "\n" for r in [
+        {"id": "a", "last_modified": "2026-01-03T00:00:00+00:00", "v": "newer"},
+        {"id": "a", "last_modified": "2026-01-02T00:00:00+00:00", "v": "older delta"},
+        {"id": "b", "last_modified": "2026-01-04T00:00:00+00:00", "v": "stale delta"},
+        {"id": "c", "last_modified": "2026-01-04T00:00:00+00:00", "v": "new"},
+    ]))
+
+    stats = hf.merge_delta(str(snapshot_path), str(delta_path))
+
+    assert sorted((r["id"], r["v"]) for r in read_jsonl(snapshot_path)) == [
+        ("a", "newer"), ("b", "snapshot"), ("c", "new")
+    ]
+    assert stats == {"total": 3, "updated": 1, "added": 1}
+
+
+def test_merge_resolves_snapshot_duplicates_by_timestamp(tmp_path):
+    # A multi-day full harvest can list the same id twice with different timestamps
+    snapshot_path = tmp_path / "snapshot.jsonl"
+    delta_path = tmp_path / "delta.jsonl"
+    snapshot_path.write_text("".join(json.dumps(r) + "\n" for r in [
+        {"id": "a", "last_modified": "2026-01-01T00:00:00+00:00", "v": "first copy"},
+        {"id": "b", "last_modified": "2026-01-01T00:00:00+00:00", "v": "b"},
+        {"id": "a", "last_modified": "2026-01-09T00:00:00+00:00", "v": "newest copy"},
+        {"id": "c", "last_modified": "2026-01-09T00:00:00+00:00", "v": "newest c"},
+        {"id": "c", "last_modified": "2026-01-02T00:00:00+00:00", "v": "stale c"},
+    ]))
+    delta_path.write_text(json.dumps(
+        {"id": "a", "last_modified": "2026-01-05T00:00:00+00:00", "v": "delta"}
+    ) + "\n")
+
+    stats = hf.merge_delta(str(snapshot_path), str(delta_path))
+
+    assert sorted((r["id"], r["v"]) for r in read_jsonl(snapshot_path)) == [
+        ("a", "newest copy"), ("b", "b"), ("c", "newest c")
+    ]
+    assert stats == {"total": 3, "updated": 0, "added": 0}
+
+
+def test_state_round_trip(tmp_path):
+    path = str(tmp_path / "state.json")
+    state = {"models": (BASE, "m1"), "spaces": (BASE + timedelta(hours=1), "")}
+    hf.save_state(path, state)
+    assert hf.load_state(path) == state
+    assert hf.load_state(str(tmp_path / "missing.json")) == {}
+
+
+def test_load_state_rejects_unparseable_timestamp(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"models": {"last_modified": "yesterday", "id": "m1"}}))
+    with pytest.raises(ValueError):
+        hf.load_state(str(path))